@@ -1,8 +1,22 @@
+import argparse
+from contextlib import nullcontext
+
 from products import Product, NonStockedProduct, LimitedProduct
 from store import Store
+from profiler import Profiler
 import promotions
 
-def start(store):
+
+def profile_action(profiler, action):
+    """
+    Returns a context that profiles the action, or does nothing without a profiler.
+    """
+    if profiler is None:
+        return nullcontext()
+    return profiler.profile(action)
+
+
+def start(store, profiler=None):
     """
     Starts the interactive CLI for the provided store.
 
@@ -13,6 +27,7 @@ def start(store):
       4. Quit the application
 
     Prompts the user for input and performs the corresponding action until the user chooses to quit.
+    If a Profiler is given, the store work of each action is profiled separately.
     """
     while True:
         print("\n   Store Menu")
@@ -25,16 +40,19 @@ def start(store):
 
         if choice == "1":
             # List all active products
-            products = store.get_all_products()
+            with profile_action(profiler, "list"):
+                products = store.get_all_products()
+                product_lines = [product.show() for product in products]
             if not products:
                 print("No active products available.")
             else:
-                for product in products:
-                    print(product.show())
+                for line in product_lines:
+                    print(line)
 
         elif choice == "2":
             # Show total quantity of all products
-            total_quantity = store.get_total_quantity()
+            with profile_action(profiler, "total"):
+                total_quantity = store.get_total_quantity()
             print(f"Total quantity in store: {total_quantity}")
 
 
@@ -102,7 +120,8 @@ def start(store):
 
             if shopping_list:
                 try:
-                    total_price = store.order(shopping_list)
+                    with profile_action(profiler, "order"):
+                        total_price = store.order(shopping_list)
                     print(f"Total order cost: {total_price} dollars.")
                 except ValueError as ve:
                     print(f"Order error: {ve}")
@@ -122,7 +141,18 @@ def start(store):
 def main():
     """
     Initializes the store with a set of products and launches the CLI.
+    With --profile, each menu action is profiled and reports are written on exit.
     """
+    parser = argparse.ArgumentParser(description="Best Buy store CLI")
+    parser.add_argument("--profile", action="store_true",
+                        help="profile each menu action (list, total, order)")
+    parser.add_argument("--profile-dir", default="profile_output",
+                        help="directory for the profiling reports")
+    parser.add_argument("--no-trace-memory", action="store_true",
+                        help="skip tracemalloc so profile timings have no "
+                             "allocation tracing overhead")
+    args = parser.parse_args()
+
     # Setup initial stock of inventory
     # setup initial stock of inventory
     product_list = [
@@ -144,7 +174,13 @@ def main():
     product_list[1].set_promotion(third_one_free)  # Earbuds
     product_list[3].set_promotion(thirty_percent)  # Windows License
 
-    start(best_buy)
+    if args.profile:
+        with Profiler(args.profile_dir,
+                      trace_memory=not args.no_trace_memory) as profiler:
+            start(best_buy, profiler)
+        print(f"Profiling reports written to {args.profile_dir}/")
+    else:
+        start(best_buy)
 
 
 if __name__ == "__main__":
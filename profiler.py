@@ -0,0 +1,250 @@
+import cProfile
+import io
+import os
+import pstats
+import tracemalloc
+
+# Frames and allocations of the profiler itself are left out of the reports
+_PROFILER_FILES = (__file__, tracemalloc.__file__)
+_PROFILER_BUILTINS = ("<method 'disable' of '_lsprof.Profiler' objects>",)
+_SNAPSHOT_FILTERS = [tracemalloc.Filter(False, path) for path in _PROFILER_FILES]
+
+
+class Profiler:
+    """
+    Collects cProfile stats and tracemalloc allocations per named action.
+
+    Usage:
+        with Profiler("profile_output") as profiler:
+            with profiler.profile("order"):
+                store.order(shopping_list)
+
+    Repeated runs of the same action are accumulated. When the profiler is
+    closed, a report (<action>.txt), the raw pstats dump (<action>.prof) and
+    a flamegraph-compatible collapsed-stack file (<action>.collapsed) are
+    written to the output directory for every action.
+
+    tracemalloc adds overhead to every allocation, which is included in the
+    cProfile times. Pass trace_memory=False for timing-only profiles.
+    """
+
+    def __init__(self, output_dir="profile_output", top=20, trace_memory=True):
+        """
+        Initializes the profiler.
+        `top` limits how many entries are listed in each report section.
+        """
+        self.output_dir = output_dir
+        self.top = top
+        self.trace_memory = trace_memory
+        self.profiles = {}
+        self.allocations = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def profile(self, action):
+        """
+        Returns a context manager that profiles the wrapped block under the
+        given action name. The action is only recorded once the block is
+        entered.
+        """
+        return _ActionProfile(self, action)
+
+    def _record_allocations(self, action, differences):
+        """
+        Adds the bytes and blocks allocated by one run to the action's
+        totals. Blocks freed during the run mostly belong to the surrounding
+        code and are skipped.
+        """
+        totals = self.allocations[action]
+        for diff in differences:
+            if diff.size_diff <= 0:
+                continue
+            location = str(diff.traceback)
+            size, count = totals.get(location, (0, 0))
+            totals[location] = (size + diff.size_diff, count + max(diff.count_diff, 0))
+
+    def stats(self, action):
+        """
+        Returns the pstats.Stats collected for an action, without the
+        profiler's own frames.
+        """
+        if action not in self.profiles:
+            raise ValueError(f"No profile recorded for action '{action}'.")
+        try:
+            stats = pstats.Stats(self.profiles[action])
+        except TypeError:
+            raise ValueError(f"No profile data recorded for action '{action}'.")
+        _remove_profiler_frames(stats)
+        return stats
+
+    def report(self, action):
+        """
+        Returns a text report with the top functions and allocation sites.
+        """
+        stats = self.stats(action)
+        output = io.StringIO()
+        stats.stream = output
+        output.write(f"Profile for action: {action}\n")
+        if self.trace_memory:
+            output.write(
+                "Memory tracing: on (times include tracemalloc overhead, "
+                "profile with trace_memory=False for accurate timing)\n\n"
+            )
+        else:
+            output.write("Memory tracing: off\n\n")
+        stats.sort_stats("cumulative").print_stats(self.top)
+
+        if not self.trace_memory:
+            return output.getvalue()
+        output.write("Allocations during the action (bytes, blocks, location):\n")
+        allocations = sorted(
+            self.allocations.get(action, {}).items(),
+            key=lambda item: item[1][0],
+            reverse=True,
+        )
+        if not allocations:
+            output.write("  No allocations recorded.\n")
+        for location, (size, count) in allocations[:self.top]:
+            output.write(f"  {size} B, {count} blocks, {location}\n")
+        return output.getvalue()
+
+    def collapsed_stacks(self, action):
+        """
+        Returns collapsed-stack lines ("caller;callee <microseconds>").
+
+        cProfile only records caller/callee edges, so full stacks are
+        reconstructed from the roots and each function's own time is split
+        between its callers in proportion to their cumulative time. Frames
+        with any own time are counted as at least one microsecond.
+        """
+        raw_stats = self.stats(action).stats
+        children = {}
+        for func, (_, _, _, _, callers) in raw_stats.items():
+            for caller in callers:
+                children.setdefault(caller, []).append(func)
+
+        lines = {}
+
+        def walk(func, path, weight):
+            own_time = raw_stats[func][2] * weight
+            if own_time > 0:
+                micros = max(1, round(own_time * 1_000_000))
+                stack = ";".join(path)
+                lines[stack] = lines.get(stack, 0) + micros
+            for child in children.get(func, []):
+                name = _frame_name(child)
+                if name in path:
+                    continue
+                child_total = raw_stats[child][3]
+                via_caller = raw_stats[child][4][func][3]
+                share = via_caller / child_total if child_total else 0
+                walk(child, path + [name], weight * share)
+
+        for func, (_, _, _, _, callers) in raw_stats.items():
+            if not callers:
+                walk(func, [_frame_name(func)], 1.0)
+
+        return [f"{stack} {micros}" for stack, micros in lines.items()]
+
+    def write_reports(self):
+        """
+        Writes the report, pstats dump and collapsed stacks for every action.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        for action in self.profiles:
+            base = os.path.join(self.output_dir, action)
+            self.stats(action).dump_stats(f"{base}.prof")
+            with open(f"{base}.txt", "w") as report_file:
+                report_file.write(self.report(action))
+            with open(f"{base}.collapsed", "w") as collapsed_file:
+                for line in self.collapsed_stacks(action):
+                    collapsed_file.write(line + "\n")
+
+    def close(self):
+        """
+        Writes all reports.
+        """
+        self.write_reports()
+
+
+class _ActionProfile:
+    """
+    Context manager for a single profiled run of an action.
+
+    cProfile is enabled last on entry and disabled first on exit, so that
+    as little of the profiler as possible ends up in the stats. tracemalloc
+    is only started around the block, unless it was already tracing.
+    """
+
+    def __init__(self, profiler, action):
+        self.profiler = profiler
+        self.action = action
+        self.profile = None
+        self.started_tracemalloc = False
+        self.before = None
+
+    def __enter__(self):
+        if self.action not in self.profiler.profiles:
+            self.profiler.profiles[self.action] = cProfile.Profile()
+            self.profiler.allocations[self.action] = {}
+        self.profile = self.profiler.profiles[self.action]
+        if self.profiler.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started_tracemalloc = True
+            self.before = tracemalloc.take_snapshot()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profile.disable()
+        if self.profiler.trace_memory:
+            after = tracemalloc.take_snapshot()
+            if self.started_tracemalloc:
+                tracemalloc.stop()
+            differences = after.filter_traces(_SNAPSHOT_FILTERS).compare_to(
+                self.before.filter_traces(_SNAPSHOT_FILTERS), "lineno"
+            )
+            self.profiler._record_allocations(self.action, differences)
+        return False
+
+
+def _is_profiler_frame(func):
+    """
+    Returns True if a pstats function key belongs to the profiler itself.
+    """
+    filename, _, name = func
+    return filename in _PROFILER_FILES or name in _PROFILER_BUILTINS
+
+
+def _remove_profiler_frames(stats):
+    """
+    Removes the profiler's own frames from a pstats.Stats, including the
+    caller entries that point at them.
+    """
+    for func in [func for func in stats.stats if _is_profiler_frame(func)]:
+        del stats.stats[func]
+    for func, (cc, nc, tt, ct, callers) in stats.stats.items():
+        callers = {
+            caller: timing for caller, timing in callers.items()
+            if not _is_profiler_frame(caller)
+        }
+        stats.stats[func] = (cc, nc, tt, ct, callers)
+    stats.total_calls = sum(nc for _, nc, _, _, _ in stats.stats.values())
+    stats.prim_calls = sum(cc for cc, _, _, _, _ in stats.stats.values())
+    stats.total_tt = sum(tt for _, _, tt, _, _ in stats.stats.values())
+
+
+def _frame_name(func):
+    """
+    Formats a pstats function key as "function (file:line)".
+    """
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
@@ -0,0 +1,148 @@
+"""
+Unit tests for the Profiler class in profiler.py.
+"""
+
+import contextlib
+
+import pytest
+from products import Product
+from store import Store
+from profiler import Profiler
+
+
+@pytest.fixture
+def store():
+    return Store([Product("Test Product", price=100, quantity=100)])
+
+
+def test_profile_store_order(store, tmp_path):
+    """Test that profiling Store.order records stats and writes all reports."""
+    product = store.get_all_products()[0]
+    with Profiler(tmp_path) as profiler:
+        with profiler.profile("order"):
+            assert store.order([(product, 2)]) == 200
+        function_names = {name for _, _, name in profiler.stats("order").stats}
+        assert "order" in function_names
+        assert "buy" in function_names
+
+    assert (tmp_path / "order.prof").exists()
+    assert "Profile for action: order" in (tmp_path / "order.txt").read_text()
+    collapsed = (tmp_path / "order.collapsed").read_text().splitlines()
+    assert any(line.startswith("order (store.py:") for line in collapsed)
+    for line in collapsed:
+        stack, micros = line.rsplit(" ", 1)
+        assert stack and int(micros) > 0
+
+
+def test_profile_actions_are_separate(store, tmp_path):
+    """Test that each action gets its own stats and repeated runs accumulate."""
+    with Profiler(tmp_path) as profiler:
+        for _ in range(2):
+            with profiler.profile("total"):
+                store.get_total_quantity()
+        with profiler.profile("list"):
+            store.get_all_products()
+
+        total_calls = {
+            name: stat[1] for (_, _, name), stat in profiler.stats("total").stats.items()
+        }
+        assert total_calls["get_total_quantity"] == 2
+        assert "get_all_products" not in total_calls
+
+    assert {path.name for path in tmp_path.iterdir()} == {
+        f"{action}.{ext}" for action in ("total", "list")
+        for ext in ("prof", "txt", "collapsed")
+    }
+
+
+def test_stats_for_unknown_action():
+    """Test that asking for an action that was never profiled raises an error."""
+    profiler = Profiler()
+    with pytest.raises(ValueError):
+        profiler.stats("order")
+    with pytest.raises(ValueError):
+        profiler.report("order")
+
+
+def test_profiler_frames_are_excluded(store, tmp_path):
+    """Test that the profiler's own frames are not in the stats or stacks."""
+    product = store.get_all_products()[0]
+    with Profiler(tmp_path) as profiler:
+        with profiler.profile("order"):
+            store.order([(product, 1)])
+        filenames = {filename for filename, _, _ in profiler.stats("order").stats}
+        assert not any(name.endswith(("profiler.py", "contextlib.py"))
+                       for name in filenames)
+
+    collapsed = (tmp_path / "order.collapsed").read_text()
+    assert "profiler.py" not in collapsed
+    assert "contextlib.py" not in collapsed
+
+
+def test_profile_records_allocations(tmp_path):
+    """Test that memory allocated by an order shows up in the allocation report."""
+    product = Product("Test Product", price=100.5, quantity=100)
+    store = Store([product])
+    with Profiler(tmp_path) as profiler:
+        with profiler.profile("order"):
+            total_price = store.order([(product, 3)])
+
+    assert total_price == 301.5
+    allocations = profiler.allocations["order"]
+    assert any(
+        ("store.py" in location or "products.py" in location) and size > 0
+        for location, (size, _) in allocations.items()
+    )
+    assert all(size > 0 and count >= 0 for size, count in allocations.values())
+    report = (tmp_path / "order.txt").read_text()
+    assert "No allocations recorded." not in report
+    assert "store.py" in report.split("Allocations")[1]
+
+
+def test_profile_without_memory_tracing(store, tmp_path):
+    """Test that trace_memory=False profiles timings only."""
+    with Profiler(tmp_path, trace_memory=False) as profiler:
+        with profiler.profile("total"):
+            store.get_total_quantity()
+
+    assert profiler.allocations["total"] == {}
+    report = (tmp_path / "total.txt").read_text()
+    assert "Memory tracing: off" in report
+    assert "Allocations" not in report
+
+
+def test_short_calls_in_collapsed_stacks(store, tmp_path):
+    """Test that frames with sub-microsecond own time are still listed."""
+    product = store.get_all_products()[0]
+    with Profiler(tmp_path) as profiler:
+        with profiler.profile("order"):
+            store.order([(product, 1)])
+        collapsed = "\n".join(profiler.collapsed_stacks("order"))
+
+    assert "isinstance" in collapsed
+    assert "is_active" in collapsed
+
+
+def test_profile_context_never_entered(store, tmp_path):
+    """Test that a profile context that is never entered records nothing."""
+    with Profiler(tmp_path) as profiler:
+        profiler.profile("unused")
+        with profiler.profile("total"):
+            store.get_total_quantity()
+
+    with pytest.raises(ValueError):
+        profiler.stats("unused")
+    assert "unused" not in profiler.allocations
+    assert not (tmp_path / "unused.txt").exists()
+    assert (tmp_path / "total.txt").exists()
+
+
+def test_contextlib_frames_are_kept(tmp_path):
+    """Test that contextlib used by profiled code is not filtered out."""
+    with Profiler(tmp_path) as profiler:
+        with profiler.profile("suppress"):
+            with contextlib.suppress(ValueError):
+                raise ValueError("ignored")
+        filenames = {filename for filename, _, _ in profiler.stats("suppress").stats}
+
+    assert contextlib.__file__ in filenames